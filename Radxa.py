@@ -12,11 +12,103 @@ import time
 from datetime import datetime
 from collections import deque
 import csv
+import json
+import numpy as np
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet
 import os
+import io
+
+POT_COLORS = {'Pot1': '#e74c3c', 'Pot2': '#3498db', 'Pot3': '#2ecc71', 'Pot4': '#f39c12', 'Pot5': '#9b59b6'}
+
+
+class PerfStats:
+    # Histogramas en escala log2 de microsegundos: el bucket b cubre [2^(b-1), 2^b) us
+    HISTOGRAM_BUCKETS = 32
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self.last_errors = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            self.gauges[name] = {'value': value, 'max': value}
+        else:
+            gauge['value'] = value
+            if value > gauge['max']:
+                gauge['max'] = value
+
+    def observe(self, name, seconds):
+        bucket = min(int(seconds * 1e6).bit_length(), self.HISTOGRAM_BUCKETS - 1)
+        timer = self.timers.get(name)
+        if timer is None:
+            # Se publica ya con la primera observación: snapshot() corre en otro hilo
+            buckets = [0] * self.HISTOGRAM_BUCKETS
+            buckets[bucket] = 1
+            self.timers[name] = {'count': 1, 'total': seconds, 'max': seconds, 'buckets': buckets}
+            return
+        timer['count'] += 1
+        timer['total'] += seconds
+        if seconds > timer['max']:
+            timer['max'] = seconds
+        timer['buckets'][bucket] += 1
+
+    def error(self, name, message):
+        self.count(name)
+        self.last_errors[name] = message
+
+    def percentile(self, timer, fraction):
+        target = timer['count'] * fraction
+        seen = 0
+        for bucket, count in enumerate(timer['buckets']):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) / 1e6, timer['max'])
+        return timer['max']
+
+    def snapshot(self):
+        uptime = max(time.time() - self.started, 1e-9)
+        timers = {}
+        for name, timer in list(self.timers.items()):
+            if not timer['count']:
+                continue
+            timers[name] = {
+                'count': timer['count'],
+                'mean_ms': timer['total'] / timer['count'] * 1000,
+                'p50_ms': self.percentile(timer, 0.50) * 1000,
+                'p95_ms': self.percentile(timer, 0.95) * 1000,
+                'p99_ms': self.percentile(timer, 0.99) * 1000,
+                'max_ms': timer['max'] * 1000,
+                'buckets_us_log2': list(timer['buckets'])
+            }
+        counters = dict(self.counters)
+        return {
+            'enabled': self.enabled,
+            'uptime_s': uptime,
+            'counters': counters,
+            'rates_per_s': {name: value / uptime for name, value in counters.items()},
+            'gauges': {name: dict(gauge) for name, gauge in list(self.gauges.items())},
+            'timers': timers,
+            'last_errors': dict(self.last_errors)
+        }
+
+    def dump_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
 
 class ArduinoMonitor:
     def __init__(self, root):
@@ -31,17 +123,47 @@ class ArduinoMonitor:
         self.is_calibrating = False
         
         self.pot_data = {
-            'Pot1': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'enabled': False, 'color': '#e74c3c', 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
-            'Pot2': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'enabled': False, 'color': '#3498db', 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
-            'Pot3': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'enabled': False, 'color': '#2ecc71', 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
-            'Pot4': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'enabled': False, 'color': '#f39c12', 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
-            'Pot5': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'enabled': False, 'color': '#9b59b6', 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False}
+            'Pot1': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'all_events': [], 'enabled': False, 'color': POT_COLORS['Pot1'], 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
+            'Pot2': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'all_events': [], 'enabled': False, 'color': POT_COLORS['Pot2'], 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
+            'Pot3': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'all_events': [], 'enabled': False, 'color': POT_COLORS['Pot3'], 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
+            'Pot4': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'all_events': [], 'enabled': False, 'color': POT_COLORS['Pot4'], 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False},
+            'Pot5': {'values': deque(), 'times': deque(), 'all_values': [], 'all_times': [], 'all_events': [], 'enabled': False, 'color': POT_COLORS['Pot5'], 'offset': 0, 'min_session': None, 'max_session': None, 'is_tared': False}
         }
         
         self.start_time = time.time()
         self.terminal_text = None
         self.main_terminal_text = None
-        
+
+        # Captura por eventos: condiciones por canal y ventanas pre/post alrededor de cada disparo
+        self.trigger_config = {'capture_mode': False, 'combine': 'any', 'pre_s': 1.0, 'post_s': 2.0}
+        self.trigger_settings = {
+            pot_name: {'level': None, 'slope': None, 'deviation': None, 'window': 0.5}
+            for pot_name in self.pot_data
+        }
+        self.trigger_state = {}
+        self.pretrigger_buffer = deque()
+        self.trigger_events = []
+        self.current_event_id = None
+        self.trigger_post_end = None
+        self.event_markers = {pot_name: [] for pot_name in self.pot_data}
+        self.drawn_event_count = 0
+        self.reset_trigger_state()
+
+        # Vista espectral: FFT con ventana Hann y solapamiento, recalculada cada 'hop' muestras nuevas
+        self.spectrum_config = {'fft_size': 256, 'hop': 64, 'averaging': 0.3, 'bands': [(0.5, 5.0), (5.0, 15.0), (15.0, 30.0), (30.0, 50.0)]}
+        self.spectrum_window = np.hanning(self.spectrum_config['fft_size'])
+        self.spectrum_buffer = np.empty(self.spectrum_config['fft_size'])
+        bin_weights = np.full(self.spectrum_config['fft_size'] // 2 + 1, 2.0)
+        bin_weights[0] = 1.0
+        bin_weights[-1] = 1.0
+        self.spectrum_scale = bin_weights / (self.spectrum_config['fft_size'] * np.sum(self.spectrum_window ** 2))
+        self.spectrum_state = {pot_name: self.new_spectrum_state() for pot_name in self.pot_data}
+        self.spectrum_popup = None
+
+        # Instrumentación del camino crítico; desactivada solo cuesta la comprobación de 'enabled'
+        self.perf = PerfStats()
+        self.stats_popup = None
+
         self.setup_ui()
         self.update_ports()
         
@@ -102,6 +224,13 @@ class ArduinoMonitor:
         self.record_btn = ttk.Button(control_frame, text="Iniciar captura de datos", command=self.toggle_recording, state='disabled', style='Record.TButton')
         self.record_btn.grid(row=0, column=4, padx=10)
 
+        self.trigger_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Captura por eventos", variable=self.trigger_mode_var,
+                        command=self.toggle_trigger_mode).grid(row=0, column=5, padx=5)
+        ttk.Button(control_frame, text="Configurar disparadores", command=self.show_trigger_popup, style='Action.TButton').grid(row=0, column=6, padx=5)
+        ttk.Button(control_frame, text="Vista espectral", command=self.show_spectrum_popup, style='Action.TButton').grid(row=0, column=7, padx=5)
+        ttk.Button(control_frame, text="Estadísticas", command=self.show_stats_popup, style='Action.TButton').grid(row=0, column=8, padx=5)
+
         report_frame = ttk.LabelFrame(main_frame, text="Reportes", padding="10")
         report_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
@@ -428,21 +557,474 @@ class ArduinoMonitor:
                 pot_info['times'].clear()
                 pot_info['all_values'].clear()
                 pot_info['all_times'].clear()
+                pot_info['all_events'].clear()
                 pot_info['min_session'] = None
                 pot_info['max_session'] = None
-            
+
+            self.reset_trigger_state()
+            self.trigger_events = []
+            self.clear_event_markers()
+
             self.record_btn.config(text="Detener captura de datos", style='Disconnect.TButton')
-            messagebox.showinfo("Grabación Iniciada", "Se ha iniciado la grabación. El tiempo se ha reiniciado a 0.")
+            if self.trigger_config['capture_mode']:
+                messagebox.showinfo("Grabación Iniciada", f"Se ha iniciado la captura por eventos. Se guardarán {self.trigger_config['pre_s']} s antes y {self.trigger_config['post_s']} s después de cada disparo.")
+            else:
+                messagebox.showinfo("Grabación Iniciada", "Se ha iniciado la grabación. El tiempo se ha reiniciado a 0.")
         else:
             self.record_btn.config(text="Iniciar  captura de datos", style='Record.TButton')
-            messagebox.showinfo("Grabación Detenida", "Se ha detenido la grabación. Los datos capturados están listos para ser exportados.")
+            if self.trigger_config['capture_mode']:
+                messagebox.showinfo("Grabación Detenida", f"Se ha detenido la grabación. Los datos capturados están listos para ser exportados.\n\nEventos registrados: {len(self.trigger_events)}")
+            else:
+                messagebox.showinfo("Grabación Detenida", "Se ha detenido la grabación. Los datos capturados están listos para ser exportados.")
+
+    def toggle_trigger_mode(self):
+        if self.is_recording_session:
+            self.trigger_mode_var.set(self.trigger_config['capture_mode'])
+            messagebox.showwarning("Captura en curso", "Detén la captura de datos antes de cambiar el modo de captura.")
+            return
+        self.trigger_config['capture_mode'] = self.trigger_mode_var.get()
+
+    def show_trigger_popup(self):
+        popup = tk.Toplevel(self.root)
+        popup.title("Configuración de Disparadores")
+        popup.geometry("620x330")
+        popup.transient(self.root)
+        popup.grab_set()
+
+        main_frame = ttk.Frame(popup, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        headers = ['Sensor', 'Nivel (mm)', 'Pendiente (mm/s)', 'Desviación (mm)', 'Ventana (s)']
+        for col, text in enumerate(headers):
+            ttk.Label(main_frame, text=text, font=('Arial', 9, 'bold')).grid(row=0, column=col, padx=5, pady=(0, 5))
+
+        keys = ['level', 'slope', 'deviation', 'window']
+        entries = {}
+        for row, pot_name in enumerate(self.pot_data, start=1):
+            ttk.Label(main_frame, text=pot_name.replace('Pot', 'Sensor '), foreground=self.pot_data[pot_name]['color']).grid(row=row, column=0, padx=5, pady=2)
+            entries[pot_name] = {}
+            for col, key in enumerate(keys, start=1):
+                entry = ttk.Entry(main_frame, width=10, font=('Arial', 9))
+                value = self.trigger_settings[pot_name][key]
+                if value is not None:
+                    entry.insert(0, str(value))
+                entry.grid(row=row, column=col, padx=5, pady=2)
+                entries[pot_name][key] = entry
+
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=len(self.pot_data) + 1, column=0, columnspan=len(headers), pady=(10, 0))
+
+        ttk.Label(options_frame, text="Combinar:").pack(side=tk.LEFT, padx=(0, 2))
+        combine_combo = ttk.Combobox(options_frame, width=10, state='readonly', values=['Cualquiera', 'Todos'])
+        combine_combo.current(0 if self.trigger_config['combine'] == 'any' else 1)
+        combine_combo.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(options_frame, text="Pre (s):").pack(side=tk.LEFT, padx=(0, 2))
+        pre_entry = ttk.Entry(options_frame, width=6, font=('Arial', 9))
+        pre_entry.insert(0, str(self.trigger_config['pre_s']))
+        pre_entry.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(options_frame, text="Post (s):").pack(side=tk.LEFT, padx=(0, 2))
+        post_entry = ttk.Entry(options_frame, width=6, font=('Arial', 9))
+        post_entry.insert(0, str(self.trigger_config['post_s']))
+        post_entry.pack(side=tk.LEFT)
+
+        def parse_optional(text):
+            text = text.strip()
+            return float(text) if text else None
+
+        def apply_settings():
+            try:
+                new_settings = {}
+                for pot_name, pot_entries in entries.items():
+                    new_settings[pot_name] = {key: parse_optional(entry.get()) for key, entry in pot_entries.items()}
+                    if new_settings[pot_name]['window'] is None or new_settings[pot_name]['window'] <= 0:
+                        new_settings[pot_name]['window'] = 0.5
+                pre_s = float(pre_entry.get())
+                post_s = float(post_entry.get())
+                if pre_s < 0 or post_s < 0:
+                    raise ValueError("las ventanas pre/post no pueden ser negativas")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Valor de disparador no válido: {e}", parent=popup)
+                return
+
+            self.trigger_settings = new_settings
+            self.trigger_config['combine'] = 'any' if combine_combo.get() == 'Cualquiera' else 'all'
+            self.trigger_config['pre_s'] = pre_s
+            self.trigger_config['post_s'] = post_s
+            # Solo se reinicia la detección para no cortar un evento abierto durante la captura
+            self.reset_trigger_detection()
+            popup.destroy()
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.grid(row=len(self.pot_data) + 2, column=0, columnspan=len(headers), pady=(15, 0))
+        ttk.Button(btn_frame, text="Aplicar", style='Action.TButton', command=apply_settings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cerrar", style='Small.TButton', command=popup.destroy).pack(side=tk.LEFT, padx=5)
+
+    def reset_trigger_detection(self):
+        self.trigger_state = {
+            pot_name: {'prev_time': None, 'prev_value': None, 'window': deque(), 'window_sum': 0.0,
+                       'last_fired': None, 'last_conditions': []}
+            for pot_name in self.pot_data
+        }
+        self.trigger_all_active = False
+
+    def reset_trigger_state(self):
+        self.reset_trigger_detection()
+        self.pretrigger_buffer.clear()
+        self.current_event_id = None
+        self.trigger_post_end = None
+
+    def evaluate_channel_trigger(self, pot_name, current_time, value):
+        settings = self.trigger_settings[pot_name]
+        state = self.trigger_state[pot_name]
+        fired = []
+
+        prev_time = state['prev_time']
+        prev_value = state['prev_value']
+        if prev_value is not None:
+            level = settings['level']
+            if level is not None and (prev_value < level) != (value < level):
+                fired.append('nivel')
+
+            slope = settings['slope']
+            dt = current_time - prev_time
+            if slope is not None and dt > 0 and abs(value - prev_value) / dt >= slope:
+                fired.append('pendiente')
+
+        # Desviación respecto a la media móvil de la ventana anterior a la muestra actual
+        window = state['window']
+        deviation = settings['deviation']
+        if deviation is not None and window:
+            mean = state['window_sum'] / len(window)
+            if abs(value - mean) >= deviation:
+                fired.append('desviación')
+
+        window.append((current_time, value))
+        state['window_sum'] += value
+        while window and current_time - window[0][0] > settings['window']:
+            state['window_sum'] -= window.popleft()[1]
+
+        state['prev_time'] = current_time
+        state['prev_value'] = value
+        if fired:
+            state['last_fired'] = current_time
+            state['last_conditions'] = fired
+        return fired
+
+    def evaluate_triggers(self, current_time, frame):
+        combine_all = self.trigger_config['combine'] == 'all'
+        armed = 0
+        sources = []
+        for pot_name, value in frame.items():
+            settings = self.trigger_settings[pot_name]
+            fired = self.evaluate_channel_trigger(pot_name, current_time, value)
+            if settings['level'] is None and settings['slope'] is None and settings['deviation'] is None:
+                continue
+            armed += 1
+            if combine_all:
+                # En modo "Todos" un canal sigue activo durante su ventana después de cumplir una condición
+                state = self.trigger_state[pot_name]
+                if state['last_fired'] is not None and current_time - state['last_fired'] <= settings['window']:
+                    fired = state['last_conditions']
+                else:
+                    fired = []
+            if fired:
+                sources.append(f"{pot_name.replace('Pot', 'Sensor ')}: {', '.join(fired)}")
+
+        if not armed:
+            self.trigger_all_active = False
+            return []
+        if combine_all:
+            # Solo el flanco de subida del resultado combinado inicia un evento
+            was_active = self.trigger_all_active
+            self.trigger_all_active = len(sources) == armed
+            if not self.trigger_all_active or was_active:
+                return []
+        return sources
+
+    def store_session_frame(self, current_time, frame, event_id=None):
+        for pot_name, value in frame.items():
+            pot_info = self.pot_data[pot_name]
+            pot_info['all_values'].append(value)
+            pot_info['all_times'].append(current_time)
+            if event_id is not None:
+                pot_info['all_events'].append(event_id)
+
+            if pot_info['min_session'] is None or value < pot_info['min_session']:
+                pot_info['min_session'] = value
+            if pot_info['max_session'] is None or value > pot_info['max_session']:
+                pot_info['max_session'] = value
+        if event_id is not None:
+            self.trigger_events[event_id - 1]['end'] = current_time
+
+    def process_trigger_frame(self, current_time, frame):
+        sources = self.evaluate_triggers(current_time, frame)
+        pre_s = self.trigger_config['pre_s']
+        post_s = self.trigger_config['post_s']
+
+        if self.trigger_post_end is not None:
+            if current_time <= self.trigger_post_end:
+                # Un nuevo disparo dentro de la ventana posterior extiende el evento actual
+                if sources:
+                    self.trigger_post_end = current_time + post_s
+                self.store_session_frame(current_time, frame, self.current_event_id)
+                return
+            self.current_event_id = None
+            self.trigger_post_end = None
+
+        if sources:
+            event_id = len(self.trigger_events) + 1
+            start = self.pretrigger_buffer[0][0] if self.pretrigger_buffer else current_time
+            self.trigger_events.append({'id': event_id, 'time': current_time, 'start': start, 'end': current_time, 'sources': '; '.join(sources)})
+            for buffered_time, buffered_frame in self.pretrigger_buffer:
+                self.store_session_frame(buffered_time, buffered_frame, event_id)
+            self.pretrigger_buffer.clear()
+            self.store_session_frame(current_time, frame, event_id)
+            self.current_event_id = event_id
+            self.trigger_post_end = current_time + post_s
+        else:
+            self.pretrigger_buffer.append((current_time, frame))
+            while self.pretrigger_buffer and current_time - self.pretrigger_buffer[0][0] > pre_s:
+                self.pretrigger_buffer.popleft()
+
+    def clear_event_markers(self):
+        for markers in self.event_markers.values():
+            for marker in markers:
+                marker.remove()
+            markers.clear()
+        self.drawn_event_count = 0
+
+    def draw_event_markers(self):
+        events = self.trigger_events
+        while self.drawn_event_count < len(events):
+            event = events[self.drawn_event_count]
+            for pot_name, ax in self.axes.items():
+                marker = ax.axvline(event['time'], color='#c0392b', linestyle=':', linewidth=1.5, alpha=0.8)
+                self.event_markers[pot_name].append(marker)
+            self.drawn_event_count += 1
+
+
+    def new_spectrum_state(self):
+        fft_size = self.spectrum_config['fft_size']
+        return {'enabled': False, 'samples': deque(maxlen=fft_size), 'times': deque(maxlen=fft_size), 'pending': 0,
+                'freqs': None, 'avg_power': None, 'peak_freq': None, 'band_rms': [], 'sample_rate': None, 'updated': False}
+
+    def toggle_spectrum(self, pot_name, enabled):
+        self.spectrum_state[pot_name] = self.new_spectrum_state()
+        self.spectrum_state[pot_name]['enabled'] = enabled
+
+    def update_spectra(self):
+        fft_size = self.spectrum_config['fft_size']
+        hop = self.spectrum_config['hop']
+        alpha = self.spectrum_config['averaging']
+        buf = self.spectrum_buffer
+        perf = self.perf if self.perf.enabled else None
+
+        for spec in self.spectrum_state.values():
+            if not spec['enabled'] or spec['pending'] < hop or len(spec['samples']) < fft_size:
+                continue
+            # Si se acumularon varios saltos solo se procesa la ventana más reciente
+            spec['pending'] = 0
+
+            times = spec['times']
+            duration = times[-1] - times[0]
+            if duration <= 0:
+                continue
+            sample_rate = (fft_size - 1) / duration
+            if perf:
+                start = time.perf_counter()
+
+            np.copyto(buf, tuple(spec['samples']))
+            buf -= buf.mean()
+            buf *= self.spectrum_window
+            power = np.abs(np.fft.rfft(buf)) ** 2 * self.spectrum_scale
+
+            if spec['avg_power'] is None or spec['sample_rate'] is None or abs(sample_rate - spec['sample_rate']) > 0.1 * spec['sample_rate']:
+                spec['avg_power'] = power
+            else:
+                spec['avg_power'] = (1 - alpha) * spec['avg_power'] + alpha * power
+
+            freqs = np.fft.rfftfreq(fft_size, 1.0 / sample_rate)
+            avg_power = spec['avg_power']
+            spec['sample_rate'] = sample_rate
+            spec['freqs'] = freqs
+            spec['peak_freq'] = float(freqs[np.argmax(avg_power[1:]) + 1])
+            spec['band_rms'] = [float(np.sqrt(np.sum(avg_power[(freqs >= low) & (freqs < high)])))
+                                for low, high in self.spectrum_config['bands']]
+            spec['updated'] = True
+            if perf:
+                perf.observe('spectrum.fft', time.perf_counter() - start)
+
+    def show_spectrum_popup(self):
+        if self.spectrum_popup is not None:
+            self.spectrum_popup['window'].lift()
+            return
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Vista Espectral de Vibración")
+        popup.geometry("900x750")
+
+        check_frame = ttk.Frame(popup, padding="5")
+        check_frame.pack(fill=tk.X)
+
+        fig = Figure(figsize=(8, 7), dpi=90)
+        axes = {}
+        lines = {}
+        texts = {}
+        spectrum_vars = {}
+        for i, (pot_name, pot_info) in enumerate(self.pot_data.items(), start=1):
+            var = tk.BooleanVar(value=self.spectrum_state[pot_name]['enabled'])
+            spectrum_vars[pot_name] = var
+            ttk.Checkbutton(check_frame, text=pot_name.replace('Pot', 'Sensor '), variable=var,
+                            command=lambda p=pot_name, v=var: self.toggle_spectrum(p, v.get())).pack(side=tk.LEFT, padx=5)
+
+            ax = fig.add_subplot(len(self.pot_data), 1, i)
+            ax.set_ylabel(pot_name.replace('Pot', 'S'), fontsize=9, color=pot_info['color'], fontweight='bold')
+            ax.set_yscale('log')
+            ax.grid(True, alpha=0.4, linestyle='--')
+            ax.tick_params(labelsize=8)
+            line, = ax.plot([], [], color=pot_info['color'], linewidth=1.5)
+            axes[pot_name] = ax
+            lines[pot_name] = line
+            texts[pot_name] = ax.text(0.99, 0.95, '', transform=ax.transAxes, fontsize=8, ha='right', va='top',
+                                      bbox=dict(boxstyle='round,pad=0.3', fc='wheat', alpha=0.5))
+        axes[list(self.pot_data)[-1]].set_xlabel('Frecuencia (Hz)', fontsize=9)
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=popup)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        def close_popup():
+            self.spectrum_popup = None
+            popup.destroy()
+
+        popup.protocol("WM_DELETE_WINDOW", close_popup)
+        self.spectrum_popup = {'window': popup, 'canvas': canvas, 'axes': axes, 'lines': lines, 'texts': texts}
+        for spec in self.spectrum_state.values():
+            spec['updated'] = spec['avg_power'] is not None
+
+    def draw_spectra(self):
+        panel = self.spectrum_popup
+        if panel is None:
+            return
+
+        changed = False
+        for pot_name, spec in self.spectrum_state.items():
+            if not spec['updated']:
+                continue
+            spec['updated'] = False
+            changed = True
+
+            ax = panel['axes'][pot_name]
+            panel['lines'][pot_name].set_data(spec['freqs'][1:], spec['avg_power'][1:] + 1e-12)
+            ax.set_xlim(0, spec['freqs'][-1])
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+
+            bands_text = '  '.join(f"{low:g}-{high:g} Hz: {rms:.4f}" for (low, high), rms in zip(self.spectrum_config['bands'], spec['band_rms']))
+            panel['texts'][pot_name].set_text(f"Pico: {spec['peak_freq']:.2f} Hz (fs={spec['sample_rate']:.1f} Hz)\nRMS {bands_text}")
+
+        if changed:
+            try:
+                panel['canvas'].draw_idle()
+            except tk.TclError:
+                self.spectrum_popup = None
+
+    def show_stats_popup(self):
+        if self.stats_popup is not None:
+            self.stats_popup['window'].lift()
+            return
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Estadísticas de Rendimiento")
+        popup.geometry("760x520")
+
+        top_frame = ttk.Frame(popup, padding="5")
+        top_frame.pack(fill=tk.X)
+
+        enabled_var = tk.BooleanVar(value=self.perf.enabled)
+
+        def toggle_stats():
+            if enabled_var.get() and not self.perf.enabled:
+                self.perf.reset()
+            self.perf.enabled = enabled_var.get()
+
+        def save_json():
+            filename = filedialog.asksaveasfilename(
+                parent=popup,
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                initialfile=f"estadisticas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            if not filename:
+                return
+            try:
+                self.perf.dump_json(filename)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudieron guardar las estadísticas: {str(e)}", parent=popup)
+
+        ttk.Checkbutton(top_frame, text="Instrumentación activa", variable=enabled_var, command=toggle_stats).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Reiniciar", style='Small.TButton', command=self.perf.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Guardar JSON", style='Small.TButton', command=save_json).pack(side=tk.LEFT, padx=5)
+
+        columns = ('count', 'rate', 'mean', 'p50', 'p95', 'max')
+        tree = ttk.Treeview(popup, columns=columns, show='tree headings')
+        tree.heading('#0', text='Métrica')
+        tree.column('#0', width=220)
+        for col, text in zip(columns, ['Cuenta', 'Valor/s', 'Media (ms)', 'p50 (ms)', 'p95 (ms)', 'Máx (ms)']):
+            tree.heading(col, text=text)
+            tree.column(col, width=85, anchor='center')
+        tree.tag_configure('odd', background='#f1f2f6')
+        tree.tag_configure('even', background='#ffffff')
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        errors_label = ttk.Label(popup, text="", foreground='#c0392b', font=('Arial', 9), wraplength=740, justify=tk.LEFT)
+        errors_label.pack(fill=tk.X, padx=5, pady=(0, 5))
+
+        def close_popup():
+            self.stats_popup = None
+            popup.destroy()
+
+        def refresh():
+            # Una cadena de after() de una ventana cerrada no debe tocar widgets destruidos
+            if self.stats_popup is None or self.stats_popup['window'] is not popup or not popup.winfo_exists():
+                return
+            snapshot = self.perf.snapshot()
+            for item in tree.get_children():
+                tree.delete(item)
+            row_count = 0
+            for name, value in sorted(snapshot['counters'].items()):
+                tag = 'even' if row_count % 2 == 0 else 'odd'
+                tree.insert('', 'end', text=name, values=(value, f"{snapshot['rates_per_s'][name]:.1f}", '', '', '', ''), tags=(tag,))
+                row_count += 1
+            for name, gauge in sorted(snapshot['gauges'].items()):
+                tag = 'even' if row_count % 2 == 0 else 'odd'
+                tree.insert('', 'end', text=name, values=(gauge['value'], f"máx {gauge['max']}", '', '', '', ''), tags=(tag,))
+                row_count += 1
+            for name, timer in sorted(snapshot['timers'].items()):
+                tag = 'even' if row_count % 2 == 0 else 'odd'
+                tree.insert('', 'end', text=name, values=(timer['count'], '', f"{timer['mean_ms']:.3f}", f"{timer['p50_ms']:.3f}",
+                                                          f"{timer['p95_ms']:.3f}", f"{timer['max_ms']:.3f}"), tags=(tag,))
+                row_count += 1
+            errors_label.config(text='\n'.join(f"{name}: {message}" for name, message in snapshot['last_errors'].items()))
+            popup.after(500, refresh)
+
+        popup.protocol("WM_DELETE_WINDOW", close_popup)
+        self.stats_popup = {'window': popup}
+        refresh()
 
-    
     def read_serial(self):
         while self.is_reading:
             try:
                 if self.serial_conn and self.serial_conn.in_waiting:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
+                    raw_line = self.serial_conn.readline()
+                    if self.perf.enabled:
+                        self.perf.count('serial.bytes', len(raw_line))
+                        self.perf.count('serial.lines')
+                        self.perf.gauge('serial.queue_depth', self.serial_conn.in_waiting)
+                    line = raw_line.decode('utf-8', errors='ignore').strip()
                     if not line:
                         continue
 
@@ -470,6 +1052,8 @@ class ArduinoMonitor:
                                         self.range_entries[pot_name].insert(0, r_value)
                             except (ValueError, IndexError) as e:
                                 print(f"No se pudo parsear la línea de rango: '{line}'. Error: {e}")
+                                if self.perf.enabled:
+                                    self.perf.error('parse.errors', f"Rango: {line}")
 
                         if self.terminal_text:
                             try:
@@ -486,17 +1070,30 @@ class ArduinoMonitor:
                                 pass
             except Exception as e:
                 print(f"Error leyendo serial: {e}")
+                if self.perf.enabled:
+                    self.perf.error('serial.errors', str(e))
             time.sleep(0.001)
     
     def process_data(self, line):
+        perf = self.perf if self.perf.enabled else None
+        if perf:
+            start = time.perf_counter()
+        frame = {}
+        parts = []
+        index = 0
+        parsed_upto = 0
         try:
             parts = line.replace('|', ',').split(',')
-            for part in parts:
+            current_time = time.time() - self.start_time
+            for index, part in enumerate(parts):
                 part = part.strip()
                 if ':' in part:
                     split_part = part.split(':')
                     if len(split_part) != 2:
                         print(f"Skipping malformed data part: {part}")
+                        if perf:
+                            perf.error('parse.errors', f"Fragmento mal formado: {part}")
+                            perf.count('samples.dropped')
                         continue
                     pot_name, value_str = [s.strip() for s in split_part]
                     
@@ -513,29 +1110,60 @@ class ArduinoMonitor:
                             processed_value = raw_value
 
                         adjusted_value = processed_value - pot_info['offset']
-                        current_time = time.time() - self.start_time
-                        
+
                         pot_info['values'].append(adjusted_value)
                         pot_info['times'].append(current_time)
-                        
-                        if self.is_recording_session:
-                            pot_info['all_values'].append(adjusted_value)
-                            pot_info['all_times'].append(current_time)
-                            
-                            if pot_info['min_session'] is None or adjusted_value < pot_info['min_session']:
-                                pot_info['min_session'] = adjusted_value
-                            if pot_info['max_session'] is None or adjusted_value > pot_info['max_session']:
-                                pot_info['max_session'] = adjusted_value
-       
+                        frame[pot_name] = adjusted_value
+                        parsed_upto = index + 1
+
+                        spec = self.spectrum_state[pot_name]
+                        if spec['enabled']:
+                            spec['samples'].append(adjusted_value)
+                            spec['times'].append(current_time)
+                            spec['pending'] += 1
+
                         self.pot_labels[pot_name].config(text=f"{adjusted_value:.4f} mm")
         except Exception as e:
             print(f"Error procesando datos: {e}")
+            if perf:
+                perf.error('parse.errors', str(e))
+                # Solo se pierden las partes desde la que falló; las anteriores ya están en el marco
+                perf.count('samples.dropped', sum(1 for part in parts[max(index, parsed_upto):] if ':' in part))
+                perf.count('frames.partial')
+
+        try:
+            # Como antes, un marco parcial también se guarda en la sesión
+            if frame and self.is_recording_session:
+                if self.trigger_config['capture_mode']:
+                    self.process_trigger_frame(current_time, frame)
+                else:
+                    self.store_session_frame(current_time, frame)
+        except Exception as e:
+            print(f"Error procesando datos: {e}")
+            if perf:
+                perf.error('session.errors', str(e))
+            return
+
+        if perf:
+            perf.count('frames.parsed')
+            perf.count('samples.parsed', len(frame))
+            perf.observe('parse.line', time.perf_counter() - start)
     
     def update_plot(self):
         if not self.is_reading:
             return
-        
+
+        perf = self.perf if self.perf.enabled else None
+        if perf:
+            frame_start = time.perf_counter()
+
+        self.draw_event_markers()
+        self.update_spectra()
+        self.draw_spectra()
+
         for pot_name, pot_info in self.pot_data.items():
+            if perf:
+                pot_start = time.perf_counter()
             ax = self.axes[pot_name]
             line = self.lines[pot_name]
             canvas = self.canvases[pot_name]
@@ -565,7 +1193,9 @@ class ArduinoMonitor:
                 else:
                     min_max_text.set_text('')
                 min_max_text.set_visible(True)
-                
+
+                if perf:
+                    tree_start = time.perf_counter()
                 tree = self.recent_tables[pot_name]
                 for item in tree.get_children():
                     tree.delete(item)
@@ -585,6 +1215,8 @@ class ArduinoMonitor:
                             tree.insert('', 'end', values=(f"{t:.2f}", f"{values[idx]:.4f}"), tags=(tag,))
                             idx -= 1
                             row_count += 1
+                if perf:
+                    perf.observe('tree.refresh', time.perf_counter() - tree_start)
             else:
                 line.set_data([], [])
                 line.set_visible(False)
@@ -596,7 +1228,11 @@ class ArduinoMonitor:
                     tree.delete(item)
             
             canvas.draw()
-        
+            if perf:
+                perf.observe(f'plot.{pot_name}', time.perf_counter() - pot_start)
+
+        if perf:
+            perf.observe('plot.frame', time.perf_counter() - frame_start)
         self.root.after(30, self.update_plot)
     
     def set_zero(self, pot_name):
@@ -624,7 +1260,8 @@ class ArduinoMonitor:
         
         if not filename:
             return
-        
+
+        start = time.perf_counter()
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
@@ -636,7 +1273,11 @@ class ArduinoMonitor:
                     if pot_info['enabled']:
                         headers.append(pot_name.replace('Pot', 'Sensor '))
                         enabled_pots.append(pot_name)
-                
+
+                include_events = bool(self.trigger_events)
+                if include_events:
+                    headers.append('Evento')
+
                 writer.writerow(headers)
                 
                 if not enabled_pots:
@@ -654,8 +1295,30 @@ class ArduinoMonitor:
                             row.append(f"{pot_info['all_values'][i]:.4f}")
                         else:
                             row.append('')
+                    if include_events:
+                        row.append(first_pot_info['all_events'][i] if i < len(first_pot_info['all_events']) else '')
                     writer.writerow(row)
-            
+
+            if include_events:
+                events_filename = os.path.splitext(filename)[0] + "_eventos.csv"
+                with open(events_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(['Evento', 'Disparo (s)', 'Inicio (s)', 'Fin (s)', 'Condiciones'])
+                    for event in self.trigger_events:
+                        writer.writerow([event['id'], f"{event['time']:.4f}", f"{event['start']:.4f}", f"{event['end']:.4f}", event['sources']])
+
+            spectra = {pot_name: spec for pot_name, spec in self.spectrum_state.items() if spec['avg_power'] is not None}
+            if spectra:
+                spectrum_filename = os.path.splitext(filename)[0] + "_espectro.csv"
+                with open(spectrum_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(['Sensor', 'Frecuencia (Hz)', 'Potencia (mm²)'])
+                    for pot_name, spec in spectra.items():
+                        for freq, power in zip(spec['freqs'], spec['avg_power']):
+                            writer.writerow([pot_name.replace('Pot', 'Sensor '), f"{freq:.4f}", f"{power:.6e}"])
+
+            if self.perf.enabled:
+                self.perf.observe('export.csv', time.perf_counter() - start)
             messagebox.showinfo("Exportado", f"Datos exportados exitosamente:\n{filename}\n\nSe guardaron {len(enabled_pots)} transductores seleccionados.")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo exportar: {str(e)}")
@@ -666,104 +1329,172 @@ class ArduinoMonitor:
             filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
             initialfile=f"reporte_transductores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         )
-        
+
         if not filename:
             return
-        
+
+        start = time.perf_counter()
         try:
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            styles = getSampleStyleSheet()
-            
-            title = Paragraph("Reporte de Monitoreo de Transductores", styles['Title'])
-            elements.append(title)
-            elements.append(Spacer(1, 12))
-            
-            date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            date_p = Paragraph(f"<b>Fecha de generación:</b> {date_str}", styles['Normal'])
-            elements.append(date_p)
-            elements.append(Spacer(1, 8))
-            
             enabled_list = [pot for pot, info in self.pot_data.items() if info['enabled']]
-            enabled_text = f"<b>Transductores monitoreados:</b> {', '.join(enabled_list)}"
-            elements.append(Paragraph(enabled_text, styles['Normal']))
-            elements.append(Spacer(1, 20))
-            
-            table_data = [['Transductor', 'Valor Actual', 'Promedio', 'Mínimo', 'Máximo', 'Muestras']]
-            
-            for pot_name, pot_info in self.pot_data.items():
-                if pot_info['enabled'] and pot_info['values']:
-                    data = list(pot_info['values'])
-                    avg = sum(data) / len(data)
-                    min_val = min(data)
-                    max_val = max(data)
-                    current = data[-1]
-                    
-                    table_data.append([
-                        f"{pot_name.replace('Pot', 'Sensor ')} (offset: {pot_info['offset']:.4f})",
-                        f"{current:.4f}",
-                        f"{avg:.4f}",
-                        f"{min_val:.4f}",
-                        f"{max_val:.4f}",
-                        str(len(data))
-                    ])
-            
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ecf0f1')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-            ]))
-            
-            elements.append(table)
-            elements.append(Spacer(1, 25))
-            
-            temp_images = []
-            
-            elements.append(Paragraph("Gráficas Individuales", styles['Heading2']))
-            elements.append(Spacer(1, 15))
-            
+
+            # En captura por eventos el reporte usa solo las ventanas guardadas, igual que el CSV exportado
+            capture_mode = self.trigger_config['capture_mode']
+            sensors = []
             for pot_name, pot_info in self.pot_data.items():
-                if pot_info['enabled'] and pot_info['values']:
-                    fig_individual = Figure(figsize=(7, 3.5))
-                    ax_individual = fig_individual.add_subplot(111)
-                    
-                    x_data = list(pot_info['times'])
-                    y_data = list(pot_info['values'])
-                    
-                    ax_individual.plot(x_data, y_data, color=pot_info['color'], linewidth=2, label=pot_name.replace('Pot', 'Sensor '))
-                    ax_individual.set_xlabel('Tiempo (s)', fontsize=10)
-                    ax_individual.set_ylabel('Valor', fontsize=10)
-                    ax_individual.set_title(f"{pot_name.replace('Pot', 'Sensor ')}", fontsize=12, fontweight='bold', color=pot_info['color'])
-                    ax_individual.grid(True, alpha=0.4, linestyle='--')
-                    ax_individual.yaxis.set_major_formatter(FormatStrFormatter('%.4f'))
-                    
-                    temp_img = f"temp_{pot_name}_{int(time.time())}.png"
-                    fig_individual.savefig(temp_img, dpi=150, bbox_inches='tight')
-                    temp_images.append(temp_img)
-                    
-                    elements.append(Image(temp_img, width=460, height=230))
-                    elements.append(Spacer(1, 15))
-                    
-                    plt.close(fig_individual)
-            
-            doc.build(elements)
-            
-            for temp_img in temp_images:
-                if os.path.exists(temp_img):
-                    os.remove(temp_img)
-            
+                times_source = pot_info['all_times'] if capture_mode else pot_info['times']
+                values_source = pot_info['all_values'] if capture_mode else pot_info['values']
+                if pot_info['enabled'] and values_source:
+                    data = list(values_source)
+                    sensors.append({
+                        'label': f"{pot_name.replace('Pot', 'Sensor ')} (offset: {pot_info['offset']:.4f})",
+                        'title': pot_name.replace('Pot', 'Sensor '),
+                        'color': pot_info['color'],
+                        'current': data[-1],
+                        'mean': sum(data) / len(data),
+                        'min': min(data),
+                        'max': max(data),
+                        'count': len(data),
+                        'times': list(times_source),
+                        'values': data
+                    })
+
+            spectra = []
+            for pot_name, spec in self.spectrum_state.items():
+                if spec['avg_power'] is not None:
+                    spectra.append({'label': pot_name.replace('Pot', 'Sensor '), 'sample_rate': spec['sample_rate'],
+                                    'peak_freq': spec['peak_freq'], 'band_rms': spec['band_rms']})
+
+            build_pdf_report(filename, enabled_list, sensors, self.trigger_events, spectra, self.spectrum_config['bands'])
+
+            if self.perf.enabled:
+                self.perf.observe('report.pdf', time.perf_counter() - start)
             messagebox.showinfo("Reporte Generado", f"Reporte PDF generado exitosamente:\n{filename}\n\nIncluye gráficas de {len(enabled_list)} transductores seleccionados.")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo generar el reporte: {str(e)}")
 
+
+def build_pdf_report(filename, monitored, sensors, events=None, spectra=None, spectrum_bands=None):
+    # Compartido por la interfaz y por batch_radxa.py; las gráficas se generan en memoria
+    doc = SimpleDocTemplate(filename, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    title = Paragraph("Reporte de Monitoreo de Transductores", styles['Title'])
+    elements.append(title)
+    elements.append(Spacer(1, 12))
+
+    date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    date_p = Paragraph(f"<b>Fecha de generación:</b> {date_str}", styles['Normal'])
+    elements.append(date_p)
+    elements.append(Spacer(1, 8))
+
+    enabled_text = f"<b>Transductores monitoreados:</b> {', '.join(monitored)}"
+    elements.append(Paragraph(enabled_text, styles['Normal']))
+    elements.append(Spacer(1, 20))
+
+    table_data = [['Transductor', 'Valor Actual', 'Promedio', 'Mínimo', 'Máximo', 'Muestras']]
+
+    for sensor in sensors:
+        table_data.append([
+            sensor['label'],
+            f"{sensor['current']:.4f}",
+            f"{sensor['mean']:.4f}",
+            f"{sensor['min']:.4f}",
+            f"{sensor['max']:.4f}",
+            str(sensor['count'])
+        ])
+
+    table = Table(table_data)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ecf0f1')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+    ]))
+
+    elements.append(table)
+    elements.append(Spacer(1, 25))
+
+    if events:
+        elements.append(Paragraph("Eventos Registrados", styles['Heading2']))
+        elements.append(Spacer(1, 10))
+        events_data = [['Evento', 'Disparo (s)', 'Inicio (s)', 'Fin (s)', 'Condiciones']]
+        for event in events:
+            events_data.append([
+                str(event['id']),
+                f"{event['time']:.2f}",
+                f"{event['start']:.2f}",
+                f"{event['end']:.2f}",
+                Paragraph(event['sources'], styles['Normal'])
+            ])
+        events_table = Table(events_data, colWidths=[50, 70, 70, 70, 230])
+        events_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#c0392b')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+        ]))
+        elements.append(events_table)
+        elements.append(Spacer(1, 25))
+
+    if spectra:
+        elements.append(Paragraph("Análisis Espectral", styles['Heading2']))
+        elements.append(Spacer(1, 10))
+        spectrum_data = [['Transductor', 'fs (Hz)', 'Pico (Hz)'] + [f"RMS {low:g}-{high:g} Hz" for low, high in spectrum_bands]]
+        for spec in spectra:
+            spectrum_data.append([
+                spec['label'],
+                f"{spec['sample_rate']:.1f}",
+                f"{spec['peak_freq']:.2f}"
+            ] + [f"{rms:.4f}" for rms in spec['band_rms']])
+        spectrum_table = Table(spectrum_data)
+        spectrum_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+        ]))
+        elements.append(spectrum_table)
+        elements.append(Spacer(1, 25))
+
+    elements.append(Paragraph("Gráficas Individuales", styles['Heading2']))
+    elements.append(Spacer(1, 15))
+
+    for sensor in sensors:
+        fig_individual = Figure(figsize=(7, 3.5))
+        ax_individual = fig_individual.add_subplot(111)
+
+        ax_individual.plot(sensor['times'], sensor['values'], color=sensor['color'], linewidth=2, label=sensor['title'])
+        for event in events or []:
+            ax_individual.axvline(event['time'], color='#c0392b', linestyle=':', linewidth=1.5, alpha=0.8)
+        ax_individual.set_xlabel('Tiempo (s)', fontsize=10)
+        ax_individual.set_ylabel('Valor', fontsize=10)
+        ax_individual.set_title(sensor['title'], fontsize=12, fontweight='bold', color=sensor['color'])
+        ax_individual.grid(True, alpha=0.4, linestyle='--')
+        ax_individual.yaxis.set_major_formatter(FormatStrFormatter('%.4f'))
+
+        img_buffer = io.BytesIO()
+        fig_individual.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+        img_buffer.seek(0)
+
+        elements.append(Image(img_buffer, width=460, height=230))
+        elements.append(Spacer(1, 15))
+
+        plt.close(fig_individual)
+
+    doc.build(elements)
+
 def main():
     root = tk.Tk()
     app = ArduinoMonitor(root)
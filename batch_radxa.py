@@ -0,0 +1,397 @@
+import argparse
+import csv
+import glob
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+
+import Radxa
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Conversión por lotes de sesiones exportadas (CSV de "Guardar captura de datos en CSV").
+# Cada archivo se procesa en streaming: la memoria por proceso depende de --chunk-rows y
+# --max-points, no de la duración de la sesión.
+
+MANIFEST_NAME = 'manifest.json'
+SUMMARY_NAME = 'resumen.csv'
+COMPANION_SUFFIXES = ('_eventos.csv', '_espectro.csv')
+
+
+class MinMaxDecimator:
+    # Envolvente min/max por bloques; al llenarse se fusionan bloques vecinos y se duplica su tamaño
+    def __init__(self, max_buckets):
+        self.max_buckets = max_buckets
+        self.bucket_size = 1
+        self.buckets = []
+        self.fill = 0
+
+    def add(self, t, value):
+        if self.buckets and self.fill < self.bucket_size:
+            bucket = self.buckets[-1]
+            if value < bucket[1]:
+                bucket[1] = value
+            if value > bucket[2]:
+                bucket[2] = value
+            self.fill += 1
+            return
+
+        if len(self.buckets) >= 2 * self.max_buckets:
+            self.buckets = [[a[0], min(a[1], b[1]), max(a[2], b[2])] for a, b in zip(self.buckets[0::2], self.buckets[1::2])]
+            self.bucket_size *= 2
+        self.buckets.append([t, value, value])
+        self.fill = 1
+
+    def points(self):
+        times = []
+        values = []
+        for t, low, high in self.buckets:
+            times.extend((t, t))
+            values.extend((low, high))
+        return times, values
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.last = value
+
+    def to_dict(self):
+        return {
+            'muestras': self.count,
+            'actual': self.last,
+            'promedio': self.mean if self.count else None,
+            'minimo': self.min,
+            'maximo': self.max,
+            'desviacion': math.sqrt(self.m2 / self.count) if self.count else None
+        }
+
+
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' no es un entero")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que 0 (se recibió {value})")
+    return value
+
+
+def sensor_pot_name(header):
+    return 'Pot' + header.replace('Sensor', '').strip()
+
+
+def find_sessions(input_dir, recursive, output_dir):
+    pattern = os.path.join(input_dir, '**', '*.csv') if recursive else os.path.join(input_dir, '*.csv')
+    output_dir = os.path.abspath(output_dir)
+    sessions = []
+    for path in sorted(glob.glob(pattern, recursive=recursive)):
+        if path.endswith(COMPANION_SUFFIXES):
+            continue
+        if os.path.abspath(path).startswith(output_dir + os.sep):
+            continue
+        sessions.append(path)
+    return sessions
+
+
+def output_stem(input_dir, path):
+    relative = os.path.splitext(os.path.relpath(path, input_dir))[0]
+    return relative.replace(os.sep, '__')
+
+
+def load_events(path):
+    events_path = os.path.splitext(path)[0] + '_eventos.csv'
+    if not os.path.exists(events_path):
+        return []
+    events = []
+    with open(events_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            try:
+                events.append({'id': int(row[0]), 'time': float(row[1]), 'start': float(row[2]), 'end': float(row[3]), 'sources': row[4]})
+            except (ValueError, IndexError):
+                continue
+    return events
+
+
+def process_session(task):
+    path = task['path']
+    out_dir = task['output_dir']
+    stem = task['stem']
+    options = task['options']
+    start = time.perf_counter()
+    outputs = []
+
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or not header[0].startswith('Tiempo'):
+                raise ValueError("el archivo no tiene el formato de una sesión exportada")
+
+            sensor_columns = [(i, name) for i, name in enumerate(header) if name.startswith('Sensor ')]
+            event_column = header.index('Evento') if 'Evento' in header else None
+            if not sensor_columns:
+                raise ValueError("el archivo no contiene columnas de sensores")
+
+            stats = {name: RunningStats() for _, name in sensor_columns}
+            decimators = {name: MinMaxDecimator(options['max_points']) for _, name in sensor_columns}
+
+            csv_file = None
+            csv_writer = None
+            if 'csv' in options['formats']:
+                csv_path = os.path.join(out_dir, f"{stem}.csv")
+                csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+                csv_writer = csv.writer(csv_file)
+                csv_writer.writerow(header[:1] + [name for _, name in sensor_columns] + (['Evento'] if event_column is not None else []))
+                outputs.append(csv_path)
+
+            parquet_writer = None
+            parquet_columns = None
+            if 'parquet' in options['formats']:
+                parquet_path = os.path.join(out_dir, f"{stem}.parquet")
+                fields = [pa.field(header[0], pa.float64())] + [pa.field(name, pa.float64()) for _, name in sensor_columns]
+                if event_column is not None:
+                    fields.append(pa.field('Evento', pa.int64()))
+                schema = pa.schema(fields)
+                parquet_writer = pq.ParquetWriter(parquet_path, schema)
+                parquet_columns = [[] for _ in fields]
+                outputs.append(parquet_path)
+
+            def flush_parquet():
+                if parquet_writer is not None and parquet_columns[0]:
+                    parquet_writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(parquet_columns, schema)], schema=schema))
+                    for column in parquet_columns:
+                        column.clear()
+
+            rows = 0
+            invalid_rows = 0
+            first_time = None
+            last_time = None
+            try:
+                for row in reader:
+                    try:
+                        t = float(row[0])
+                        values = [float(row[i]) if i < len(row) and row[i] != '' else None for i, _ in sensor_columns]
+                        event_id = int(row[event_column]) if event_column is not None and event_column < len(row) and row[event_column] != '' else None
+                    except (ValueError, IndexError):
+                        invalid_rows += 1
+                        continue
+
+                    rows += 1
+                    if first_time is None:
+                        first_time = t
+                    last_time = t
+                    for (_, name), value in zip(sensor_columns, values):
+                        if value is not None:
+                            stats[name].add(value)
+                            decimators[name].add(t, value)
+
+                    if csv_writer is not None:
+                        csv_writer.writerow([f"{t:.4f}"] + [f"{value:.4f}" if value is not None else '' for value in values]
+                                            + ([event_id if event_id is not None else ''] if event_column is not None else []))
+                    if parquet_writer is not None:
+                        parquet_columns[0].append(t)
+                        for column, value in zip(parquet_columns[1:], values):
+                            column.append(value)
+                        if event_column is not None:
+                            parquet_columns[-1].append(event_id)
+                        if len(parquet_columns[0]) >= options['chunk_rows']:
+                            flush_parquet()
+                flush_parquet()
+            finally:
+                if csv_file is not None:
+                    csv_file.close()
+                if parquet_writer is not None:
+                    parquet_writer.close()
+
+        events = load_events(path)
+        summary = {
+            'archivo': os.path.basename(path),
+            'filas': rows,
+            'filas_invalidas': invalid_rows,
+            'duracion_s': (last_time - first_time) if rows else 0.0,
+            'eventos': len(events),
+            'sensores': {name: stats[name].to_dict() for _, name in sensor_columns}
+        }
+        summary_path = os.path.join(out_dir, f"{stem}_resumen.json")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        outputs.append(summary_path)
+
+        if options['pdf']:
+            sensors = []
+            for _, name in sensor_columns:
+                stat = stats[name]
+                if not stat.count:
+                    continue
+                times, values = decimators[name].points()
+                sensors.append({
+                    'label': name,
+                    'title': name,
+                    'color': Radxa.POT_COLORS.get(sensor_pot_name(name), '#34495e'),
+                    'current': stat.last,
+                    'mean': stat.mean,
+                    'min': stat.min,
+                    'max': stat.max,
+                    'count': stat.count,
+                    'times': times,
+                    'values': values
+                })
+            pdf_path = os.path.join(out_dir, f"{stem}.pdf")
+            Radxa.build_pdf_report(pdf_path, [sensor_pot_name(name) for _, name in sensor_columns], sensors, events)
+            outputs.append(pdf_path)
+
+        return {'path': path, 'status': 'done', 'outputs': outputs, 'summary': summary, 'seconds': time.perf_counter() - start}
+    except Exception as e:
+        return {'path': path, 'status': 'error', 'error': f"{type(e).__name__}: {e}", 'outputs': outputs, 'seconds': time.perf_counter() - start}
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {'version': 1, 'files': {}}
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest.setdefault('files', {})
+        return manifest
+    except (OSError, ValueError):
+        print(f"Manifiesto ilegible, se procesará todo de nuevo: {path}")
+        return {'version': 1, 'files': {}}
+
+
+def save_manifest(path, manifest):
+    manifest['updated'] = datetime.now().isoformat(timespec='seconds')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def is_completed(entry, path, options):
+    if not entry or entry.get('status') != 'done' or entry.get('options') != options:
+        return False
+    stat = os.stat(path)
+    if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+        return False
+    return all(os.path.exists(output) for output in entry.get('outputs', []))
+
+
+def write_summary_csv(path, manifest):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Archivo', 'Sensor', 'Muestras', 'Promedio', 'Mínimo', 'Máximo', 'Desviación', 'Duración (s)', 'Eventos'])
+        for key, entry in sorted(manifest['files'].items()):
+            if entry.get('status') != 'done':
+                continue
+            summary = entry['summary']
+            for sensor, stat in summary['sensores'].items():
+                if not stat['muestras']:
+                    continue
+                writer.writerow([key, sensor, stat['muestras'], f"{stat['promedio']:.4f}", f"{stat['minimo']:.4f}",
+                                 f"{stat['maximo']:.4f}", f"{stat['desviacion']:.4f}", f"{summary['duracion_s']:.4f}", summary['eventos']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversión por lotes de sesiones CSV a exportaciones, resúmenes y reportes PDF")
+    parser.add_argument('input_dir', help="Directorio con sesiones exportadas (.csv)")
+    parser.add_argument('output_dir', help="Directorio de salida; contiene también el manifiesto para reanudar")
+    parser.add_argument('--workers', type=positive_int, default=os.cpu_count() or 1, help="Procesos en paralelo")
+    parser.add_argument('--formats', nargs='+', choices=['csv', 'parquet'], default=['parquet'] if pa is not None else ['csv'],
+                        help="Formatos de exportación (parquet requiere pyarrow)")
+    parser.add_argument('--no-pdf', action='store_true', help="No generar reportes PDF")
+    parser.add_argument('--chunk-rows', type=positive_int, default=50000, help="Filas por bloque al escribir Parquet")
+    parser.add_argument('--max-points', type=positive_int, default=5000, help="Bloques min/max por gráfica del reporte")
+    parser.add_argument('--tasks-per-worker', type=positive_int, default=20, help="Archivos por proceso antes de reciclarlo y liberar memoria")
+    parser.add_argument('--recursive', action='store_true', help="Buscar sesiones también en subdirectorios")
+    parser.add_argument('--force', action='store_true', help="Reprocesar aunque el manifiesto indique que ya está completo")
+    args = parser.parse_args()
+
+    input_dir = os.path.abspath(args.input_dir)
+    output_dir = os.path.abspath(args.output_dir)
+    # Las sesiones dentro del directorio de salida se ignoran, así que no pueden coincidir
+    if input_dir == output_dir or input_dir.startswith(output_dir + os.sep):
+        parser.error("el directorio de salida debe ser distinto del de entrada y no puede contenerlo")
+    if 'parquet' in args.formats and pa is None:
+        parser.error("el formato parquet requiere pyarrow (pip install pyarrow)")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    options = {'formats': sorted(args.formats), 'pdf': not args.no_pdf, 'chunk_rows': args.chunk_rows, 'max_points': args.max_points}
+
+    tasks = []
+    skipped = 0
+    for path in find_sessions(args.input_dir, args.recursive, args.output_dir):
+        key = os.path.relpath(path, args.input_dir)
+        if not args.force and is_completed(manifest['files'].get(key), path, options):
+            skipped += 1
+            continue
+        # El estado del origen se toma al encolar: si la sesión cambia durante el lote, la siguiente ejecución la reprocesa
+        stat = os.stat(path)
+        tasks.append({'path': path, 'key': key, 'stem': output_stem(args.input_dir, path), 'output_dir': args.output_dir, 'options': options,
+                      'size': stat.st_size, 'mtime': stat.st_mtime})
+
+    print(f"Sesiones por procesar: {len(tasks)} (ya completadas: {skipped})")
+    tasks_by_path = {task['path']: task for task in tasks}
+    failed = 0
+    start = time.perf_counter()
+
+    if tasks:
+        workers = max(1, min(args.workers, len(tasks)))
+        with multiprocessing.Pool(workers, maxtasksperchild=args.tasks_per_worker) as pool:
+            try:
+                for done, result in enumerate(pool.imap_unordered(process_session, tasks), start=1):
+                    task = tasks_by_path[result['path']]
+                    key = task['key']
+                    entry = {'status': result['status'], 'size': task['size'], 'mtime': task['mtime'], 'options': options,
+                             'outputs': result['outputs'], 'seconds': result['seconds']}
+                    if result['status'] == 'done':
+                        entry['summary'] = result['summary']
+                        print(f"[{done}/{len(tasks)}] {key}: ok ({result['seconds']:.1f} s)", flush=True)
+                    else:
+                        entry['error'] = result['error']
+                        failed += 1
+                        print(f"[{done}/{len(tasks)}] {key}: ERROR {result['error']}", flush=True)
+                    manifest['files'][key] = entry
+                    save_manifest(manifest_path, manifest)
+            except KeyboardInterrupt:
+                pool.terminate()
+                print("Interrumpido; las sesiones completadas quedan registradas en el manifiesto.")
+                return 1
+
+    write_summary_csv(os.path.join(args.output_dir, SUMMARY_NAME), manifest)
+    print(f"Completado en {time.perf_counter() - start:.1f} s. Errores: {failed}. Resumen: {os.path.join(args.output_dir, SUMMARY_NAME)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
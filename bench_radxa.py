@@ -0,0 +1,331 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FormatStrFormatter
+
+import Radxa
+
+# Benchmarks sin hardware ni pantalla: ArduinoMonitor se construye con una raíz Tk falsa,
+# lienzos Agg y widgets mínimos. El coste de Tk (Treeview, blit al lienzo) no se mide.
+
+SAMPLE_RATE = 100.0
+POT_NAMES = ['Pot1', 'Pot2', 'Pot3', 'Pot4', 'Pot5']
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+class FakeRoot:
+    def title(self, *args):
+        pass
+
+    def geometry(self, *args):
+        pass
+
+    def state(self, *args):
+        pass
+
+    def after(self, ms, func=None, *args):
+        return None
+
+
+class FakeLabel:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **kwargs):
+        self.options.update(kwargs)
+
+
+class FakeEntry:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+
+class FakeTree:
+    def __init__(self):
+        self.rows = {}
+        self.next_id = 0
+
+    def get_children(self):
+        return list(self.rows)
+
+    def delete(self, item):
+        del self.rows[item]
+
+    def insert(self, parent, index, values=(), tags=()):
+        self.next_id += 1
+        self.rows[self.next_id] = values
+        return self.next_id
+
+
+class FakeMessagebox:
+    def __init__(self):
+        self.errors = []
+
+    def showinfo(self, *args, **kwargs):
+        pass
+
+    def showwarning(self, *args, **kwargs):
+        pass
+
+    def showerror(self, title, message, **kwargs):
+        self.errors.append(message)
+
+
+class FakeFiledialog:
+    def __init__(self):
+        self.filename = ''
+
+    def asksaveasfilename(self, **kwargs):
+        return self.filename
+
+
+class HeadlessMonitor(Radxa.ArduinoMonitor):
+    def setup_ui(self):
+        self.pot_labels = {}
+        self.axes = {}
+        self.lines = {}
+        self.range_entries = {}
+        self.canvases = {}
+        self.min_max_texts = {}
+        self.recent_tables = {}
+
+        for pot_name, pot_info in self.pot_data.items():
+            self.pot_labels[pot_name] = FakeLabel()
+            self.range_entries[pot_name] = FakeEntry("25.0")
+
+            fig = Figure(figsize=(4.2, 3.5), dpi=90)
+            ax = fig.add_subplot(111)
+            ax.set_xlabel('Tiempo (s)', fontsize=9)
+            ax.set_ylabel('Valor', fontsize=9)
+            ax.set_title(f"{pot_name.replace('Pot', 'Sensor ')}", fontsize=10, fontweight='bold', color=pot_info['color'])
+            ax.grid(True, alpha=0.4, linestyle='--')
+            ax.tick_params(labelsize=8)
+            ax.yaxis.set_major_formatter(FormatStrFormatter('%.4f'))
+            line, = ax.plot([], [], color=pot_info['color'], linewidth=2.5)
+
+            self.axes[pot_name] = ax
+            self.lines[pot_name] = line
+            self.canvases[pot_name] = FigureCanvasAgg(fig)
+            self.recent_tables[pot_name] = FakeTree()
+            self.min_max_texts[pot_name] = ax.text(0.02, 0.98, '', transform=ax.transAxes, fontsize=9,
+                                                   verticalalignment='top', bbox=dict(boxstyle='round,pad=0.3', fc='wheat', alpha=0.5))
+
+    def update_ports(self):
+        pass
+
+
+def make_monitor():
+    monitor = HeadlessMonitor(FakeRoot())
+    for pot_info in monitor.pot_data.values():
+        pot_info['enabled'] = True
+    return monitor
+
+
+def synthetic_session(size, seed):
+    rng = random.Random(seed)
+    times = [i / SAMPLE_RATE for i in range(size)]
+    channels = {}
+    for k, pot_name in enumerate(POT_NAMES):
+        freq = 1.5 + 2.0 * k
+        channels[pot_name] = [12.5 + 5.0 * math.sin(2 * math.pi * freq * t) + rng.gauss(0, 0.05) for t in times]
+    return times, channels
+
+
+def load_session(monitor, times, channels):
+    for pot_name, values in channels.items():
+        pot_info = monitor.pot_data[pot_name]
+        pot_info['values'] = deque(values)
+        pot_info['times'] = deque(times)
+        pot_info['all_values'] = list(values)
+        pot_info['all_times'] = list(times)
+        pot_info['min_session'] = min(values)
+        pot_info['max_session'] = max(values)
+
+
+def bench_process_data(times, channels, limit):
+    monitor = make_monitor()
+    monitor.is_recording_session = True
+    count = min(len(times), limit)
+    names = list(channels)
+    lines = [','.join(f"{name}:{channels[name][i]:.4f}" for name in names) for i in range(count)]
+
+    start = time.perf_counter()
+    for line in lines:
+        monitor.process_data(line)
+    elapsed = time.perf_counter() - start
+    return {'lines': count, 'seconds': elapsed, 'lines_per_s': count / elapsed}
+
+
+def bench_update_plot(times, channels, frames):
+    monitor = make_monitor()
+    load_session(monitor, times, channels)
+    monitor.is_reading = True
+    monitor.is_recording_session = True
+    monitor.perf.enabled = True
+
+    monitor.update_plot()
+    monitor.perf.reset()
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        monitor.update_plot()
+        frame_times.append(time.perf_counter() - start)
+
+    timers = monitor.perf.snapshot()['timers']
+    frame_times.sort()
+    return {
+        'buffer_length': len(times),
+        'frames': frames,
+        'frame_mean_ms': sum(frame_times) / frames * 1000,
+        'frame_p50_ms': frame_times[frames // 2] * 1000,
+        'frame_max_ms': frame_times[-1] * 1000,
+        'canvas_mean_ms': {name.split('.', 1)[1]: timer['mean_ms'] for name, timer in timers.items() if name.startswith('plot.Pot')},
+        'tree_refresh_mean_ms': timers['tree.refresh']['mean_ms'] if 'tree.refresh' in timers else None
+    }
+
+
+def bench_export_csv(times, channels, workdir):
+    monitor = make_monitor()
+    load_session(monitor, times, channels)
+    Radxa.filedialog.filename = os.path.join(workdir, 'bench_export.csv')
+    Radxa.messagebox.errors.clear()
+
+    start = time.perf_counter()
+    monitor.export_csv()
+    elapsed = time.perf_counter() - start
+    size_bytes = os.path.getsize(Radxa.filedialog.filename) if os.path.exists(Radxa.filedialog.filename) else 0
+    return {'rows': len(times), 'seconds': elapsed, 'rows_per_s': len(times) / elapsed,
+            'file_bytes': size_bytes, 'errors': list(Radxa.messagebox.errors)}
+
+
+def bench_pdf_report(times, channels, workdir, measure_memory):
+    monitor = make_monitor()
+    load_session(monitor, times, channels)
+    Radxa.filedialog.filename = os.path.join(workdir, 'bench_report.pdf')
+    Radxa.messagebox.errors.clear()
+
+    start = time.perf_counter()
+    monitor.generate_pdf_report()
+    elapsed = time.perf_counter() - start
+    result = {'samples': len(times), 'seconds': elapsed, 'errors': list(Radxa.messagebox.errors), 'peak_memory_mb': None}
+
+    if measure_memory:
+        # Segunda pasada con tracemalloc para no contaminar el tiempo medido
+        tracemalloc.start()
+        monitor.generate_pdf_report()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_mb'] = peak / (1024 * 1024)
+    return result
+
+
+def environment_info():
+    import numpy
+    import reportlab
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'matplotlib': matplotlib.__version__,
+        'numpy': numpy.__version__,
+        'reportlab': reportlab.Version
+    }
+
+
+def compare_results(baseline, current):
+    metrics = [
+        ('process_data', 'lines_per_s', True),
+        ('update_plot', 'frame_mean_ms', False),
+        ('export_csv', 'rows_per_s', True),
+        ('pdf_report', 'seconds', False),
+        ('pdf_report', 'peak_memory_mb', False)
+    ]
+    print(f"{'Tamaño':>10}  {'Métrica':<30} {'Base':>12} {'Actual':>12} {'Cambio':>8}")
+    for size, results in current['results'].items():
+        base_results = baseline.get('results', {}).get(size)
+        if not base_results:
+            continue
+        for bench, key, higher_is_better in metrics:
+            old = base_results.get(bench, {}).get(key)
+            new = results.get(bench, {}).get(key)
+            if not old or new is None:
+                continue
+            change = (new / old - 1) * 100
+            if not higher_is_better:
+                change = -change
+            print(f"{size:>10}  {bench + '.' + key:<30} {old:>12.3f} {new:>12.3f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de Radxa.py sin hardware ni pantalla")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Muestras por canal de cada sesión sintética (5 canales). 10000000 requiere varios GB de RAM")
+    parser.add_argument('--parse-limit', type=int, default=100000, help="Máximo de líneas usadas en el benchmark de process_data")
+    parser.add_argument('--frames', type=int, default=10, help="Cuadros medidos de update_plot por tamaño")
+    parser.add_argument('--skip', nargs='*', default=[], choices=['process_data', 'update_plot', 'export_csv', 'pdf_report'])
+    parser.add_argument('--no-memory', action='store_true', help="No medir memoria pico del reporte PDF")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', default=f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    Radxa.messagebox = FakeMessagebox()
+    Radxa.filedialog = FakeFiledialog()
+
+    report = {'environment': environment_info(), 'settings': vars(args), 'results': {}}
+    # Directorio temporal para los CSV y PDF generados por los benchmarks de exportación
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            print(f"== {size} muestras x 5 canales", flush=True)
+            times, channels = synthetic_session(size, args.seed)
+            results = {}
+            if 'process_data' not in args.skip:
+                results['process_data'] = bench_process_data(times, channels, args.parse_limit)
+                print(f"   process_data: {results['process_data']['lines_per_s']:.0f} líneas/s", flush=True)
+            if 'update_plot' not in args.skip:
+                results['update_plot'] = bench_update_plot(times, channels, args.frames)
+                print(f"   update_plot: {results['update_plot']['frame_mean_ms']:.2f} ms/cuadro", flush=True)
+            if 'export_csv' not in args.skip:
+                results['export_csv'] = bench_export_csv(times, channels, workdir)
+                print(f"   export_csv: {results['export_csv']['rows_per_s']:.0f} filas/s", flush=True)
+            if 'pdf_report' not in args.skip:
+                results['pdf_report'] = bench_pdf_report(times, channels, workdir, not args.no_memory)
+                peak = results['pdf_report']['peak_memory_mb']
+                print(f"   pdf_report: {results['pdf_report']['seconds']:.2f} s" + (f", pico {peak:.1f} MB" if peak is not None else ''), flush=True)
+            report['results'][str(size)] = results
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())